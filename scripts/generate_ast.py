@@ -1,42 +1,82 @@
 from __future__ import annotations
 
+import argparse
+import hashlib
 import subprocess
 import sys
-from abc import ABC
-from abc import abstractmethod
-from collections.abc import Iterator
-from itertools import chain
+from functools import cache
 from pathlib import Path
 from shutil import which
 
-type FieldList = tuple[tuple[str, str], ...]
+try:
+    import ruff_api
+except ImportError:
+    ruff_api = None  # type: ignore[assignment]
+
+type Field = tuple[str, str] | tuple[str, str, str]
+type FieldList = tuple[Field, ...]
 type SubclassMap = dict[str, FieldList]
 type NodeDefinitions = dict[str, SubclassMap]
+type NodeSpec = tuple[str, str, FieldList]
+
 
+ROOT_DIR = Path(__file__).parent.parent.resolve()
+RUFF_PATH = which("ruff")
 
 PACKAGE_NAME = "loxygen"
 TYPE_VAR = "T"
 INDENT = 4
+LINE_LENGTH = 100
+TARGET_VERSION = "py312"
+CLASS_SEPARATOR = ("", "")
+HASH_HEADER = "# gen-hash: "
 
+RESOLVED_FIELDS: FieldList = (("depth", "int", "-1"), ("slot", "int", "-1"))
 
 NODE_DEFS: NodeDefinitions = {
     "Expr": {
-        "Assign": (("name", "Token"), ("value", "Expr")),
-        "Binary": (("left", "Expr"), ("operator", "Token"), ("right", "Expr")),
+        "Assign": (
+            ("name", "Token"),
+            ("lexeme", "str"),
+            ("value", "Expr"),
+            *RESOLVED_FIELDS,
+        ),
+        "Binary": (
+            ("left", "Expr"),
+            ("operator", "Token"),
+            ("op_type", "TokenType"),
+            ("right", "Expr"),
+        ),
         "Call": (("callee", "Expr"), ("paren", "Token"), ("arguments", "list[Expr]")),
-        "Get": (("object", "Expr"), ("name", "Token")),
+        "Get": (("object", "Expr"), ("name", "Token"), ("lexeme", "str")),
         "Grouping": (("expr", "Expr"),),
         "Literal": (("value", "LiteralValue"),),
-        "Logical": (("left", "Expr"), ("operator", "Token"), ("right", "Expr")),
-        "Set": (("object", "Expr"), ("name", "Token"), ("value", "Expr")),
-        "Super": (("keyword", "Token"), ("method", "Token")),
-        "This": (("keyword", "Token"),),
-        "Unary": (("operator", "Token"), ("right", "Expr")),
-        "Variable": (("name", "Token"),),
+        "Logical": (
+            ("left", "Expr"),
+            ("operator", "Token"),
+            ("op_type", "TokenType"),
+            ("right", "Expr"),
+        ),
+        "Set": (
+            ("object", "Expr"),
+            ("name", "Token"),
+            ("lexeme", "str"),
+            ("value", "Expr"),
+        ),
+        "Super": (("keyword", "Token"), ("method", "Token"), *RESOLVED_FIELDS),
+        "This": (("keyword", "Token"), *RESOLVED_FIELDS),
+        "Unary": (("operator", "Token"), ("op_type", "TokenType"), ("right", "Expr")),
+        "Variable": (("name", "Token"), ("lexeme", "str"), *RESOLVED_FIELDS),
     },
     "Stmt": {
         "Block": (("statements", "list[Stmt]"),),
         "Expression": (("expr", "Expr"),),
+        "For": (
+            ("initializer", "Stmt | None"),
+            ("condition", "Expr"),
+            ("increment", "Expr | None"),
+            ("body", "Stmt"),
+        ),
         "Function": (
             ("name", "Token"),
             ("params", "list[Token]"),
@@ -55,213 +95,264 @@ NODE_DEFS: NodeDefinitions = {
     },
 }
 
-
-class ClassGenerator:
-    def __init__(self, type_var: str, indent: int = INDENT) -> None:
-        self.type_var = type_var
-        self.indent = " " * indent
-
-    def format_line(self, text: str, level: int) -> str:
-        return self.indent * level + text
-
-    def get_return_type(self, node_base_class: str) -> str:
-        return "None" if node_base_class == "Stmt" else self.type_var
-
-    @staticmethod
-    def get_visitor_method_name(node_class_name: str, base_class_name: str) -> str:
-        return f"visit_{node_class_name.lower()}_{base_class_name.lower()}"
-
-
-class NodeGenerator(ClassGenerator, ABC):
-    def __init__(
-        self,
-        class_name: str,
-        base_class: str,
-        type_var: str,
-        indent: int = INDENT,
-    ) -> None:
-        super().__init__(type_var, indent)
-        self.class_name = class_name
-        self.base_class = base_class
-
-    @property
-    @abstractmethod
-    def return_type(self) -> str:
-        pass
-
-    @property
-    def inheritance_str(self) -> str:
-        return f"({self.base_class})"
-
-    @abstractmethod
-    def get_accept_decorator(self) -> str:
-        pass
-
-    @abstractmethod
-    def get_accept_body(self) -> str:
-        pass
-
-    def generate_class_declaration(self) -> Iterator[str]:
-        decorator = "@dataclass(frozen=True, slots=True)"
-        declaration = f"class {self.class_name}{self.inheritance_str}:"
-        yield from (self.format_line(line, 0) for line in (decorator, declaration))
-
-    def generate_class_attrs(self) -> Iterator[str]:
-        yield from ()
-
-    def generate_accept_method(self) -> Iterator[str]:
-        decorator = self.get_accept_decorator()
-        declaration = (
-            f"def accept[{self.type_var}]"
-            f"(self, visitor: Visitor[{self.type_var}])"
-            f" -> {self.return_type}:"
+NODE_SPECS: tuple[NodeSpec, ...] = tuple(
+    (base_class, class_name, attrs)
+    for base_class, subclass_defs in NODE_DEFS.items()
+    for class_name, attrs in subclass_defs.items()
+)
+
+
+VISITOR_TEMPLATE = "class Visitor[{type_var}](ABC):\n{methods}\n\n{dispatch_tables}"
+
+VISIT_METHOD_TEMPLATE = (
+    "{indent}@abstractmethod\n"
+    "{indent}def {method_name}(self, {param}: {node}) -> {return_type}:\n"
+    "{indent}{indent}pass"
+)
+
+DISPATCH_TABLE_TEMPLATE = (
+    "{indent}def {base_class}_dispatch_table(self) -> tuple[Callable[[Any], {return_type}], ...]:\n"
+    "{indent}{indent}return (\n"
+    "{entries}"
+    "{indent}{indent})"
+)
+
+BASE_NODE_TEMPLATE = (
+    "@dataclass(eq=False, slots=True)\n"
+    "class {class_name}(ABC):\n"
+    "{indent}kind: ClassVar[int]\n"
+    "\n"
+    "{indent}@abstractmethod\n"
+    "{indent}def accept[{type_var}](self, visitor: Visitor[{type_var}]) -> {return_type}:\n"
+    "{indent}{indent}pass"
+)
+
+CONCRETE_NODE_TEMPLATE = (
+    "@dataclass(eq=False, slots=True)\n"
+    "class {class_name}({base_class}):\n"
+    "{indent}kind = {kind}\n"
+    "\n"
+    "{attrs}"
+    "\n"
+    "{indent}def accept[{type_var}](self, visitor: Visitor[{type_var}]) -> {return_type}:\n"
+    "{indent}{indent}return visitor.{method_name}(self)"
+)
+
+
+def get_return_type(node_base_class: str, type_var: str) -> str:
+    return "None" if node_base_class == "Stmt" else type_var
+
+
+@cache
+def get_visitor_method_name(node_class_name: str, base_class_name: str) -> str:
+    return f"visit_{node_class_name.lower()}_{base_class_name.lower()}"
+
+
+@cache
+def generate_visitor(type_var: str, node_specs: tuple[NodeSpec, ...], indent: int = INDENT) -> str:
+    indent_str = " " * indent
+    methods = [
+        VISIT_METHOD_TEMPLATE.format(
+            indent=indent_str,
+            method_name=get_visitor_method_name(class_name, node_base_class),
+            param=node_base_class.lower(),
+            node=class_name,
+            return_type=get_return_type(node_base_class, type_var),
         )
-        body = self.get_accept_body()
-
-        yield from (
-            self.format_line(decorator, 1),
-            self.format_line(declaration, 1),
-            self.format_line(body, 2),
+        for node_base_class, class_name, _ in node_specs
+    ]
+    base_classes = dict.fromkeys(node_base_class for node_base_class, _, _ in node_specs)
+    dispatch_tables = [
+        DISPATCH_TABLE_TEMPLATE.format(
+            indent=indent_str,
+            base_class=base_class.lower(),
+            return_type=get_return_type(base_class, type_var),
+            entries="".join(
+                f"{indent_str * 3}self.{get_visitor_method_name(class_name, base_class)},\n"
+                for node_base_class, class_name, _ in node_specs
+                if node_base_class == base_class
+            ),
         )
+        for base_class in base_classes
+    ]
+    return VISITOR_TEMPLATE.format(
+        type_var=type_var,
+        methods="\n\n".join(methods),
+        dispatch_tables="\n\n".join(dispatch_tables),
+    )
 
-    def generate_class(self) -> Iterator[str]:
-        cls = (
-            self.generate_class_declaration(),
-            self.generate_class_attrs(),
-            self.generate_accept_method(),
-        )
-        yield from chain(*cls)
-
-
-class BaseNodeGenerator(NodeGenerator):
-    def __init__(
-        self,
-        class_name: str,
-        type_var: str,
-        indent: int = INDENT,
-    ):
-        super().__init__(class_name, "ABC", type_var, indent)
-
-    @property
-    def return_type(self) -> str:
-        return self.get_return_type(self.class_name)
-
-    def get_accept_decorator(self) -> str:
-        return "@abstractmethod"
-
-    def get_accept_body(self) -> str:
-        return "pass"
-
-
-class ConcreteNodeGenerator(NodeGenerator):
-    def __init__(
-        self,
-        class_name: str,
-        base_class: str,
-        attrs: FieldList,
-        type_var: str,
-        indent: int = INDENT,
-    ):
-        super().__init__(class_name, base_class, type_var, indent)
-        self.attrs = attrs
-
-    @property
-    def return_type(self) -> str:
-        return self.get_return_type(self.base_class)
-
-    def generate_class_attrs(self) -> Iterator[str]:
-        attrs = (self.format_line(f"{attr}:{annotation}", 1) for attr, annotation in self.attrs)
-        yield from attrs
-
-    def get_accept_decorator(self) -> str:
-        return ""
-
-    def get_accept_body(self) -> str:
-        method_name = self.get_visitor_method_name(self.class_name, self.base_class)
-        return f"return visitor.{method_name}(self)"
-
-
-class VisitorGenerator(ClassGenerator):
-    def generate_class_declaration(self) -> Iterator[str]:
-        cls = f"class Visitor[{self.type_var}](ABC):"
-        yield self.format_line(cls, 0)
-
-    def generate_visit_method(self, node: str, node_base_class: str) -> Iterator[str]:
-        decorator = "@abstractmethod"
-        method_name = self.get_visitor_method_name(node, node_base_class)
-        params = f"self, {node_base_class.lower()}: {node}"
-        return_type = self.get_return_type(node_base_class)
-        declaration = f"def {method_name}({params}) -> {return_type}:"
-        body = "pass"
-
-        yield from (
-            self.format_line(decorator, 1),
-            self.format_line(declaration, 1),
-            self.format_line(body, 2),
-        )
 
-    def generate_class(self, node_defs: NodeDefinitions) -> Iterator[str]:
-        declaration = self.generate_class_declaration()
-        methods = chain.from_iterable(
-            self.generate_visit_method(class_name, node_base_class)
-            for node_base_class, subclass_defs in node_defs.items()
-            for class_name in subclass_defs
-        )
+@cache
+def generate_base_node(class_name: str, type_var: str, indent: int = INDENT) -> str:
+    return BASE_NODE_TEMPLATE.format(
+        indent=" " * indent,
+        class_name=class_name,
+        type_var=type_var,
+        return_type=get_return_type(class_name, type_var),
+    )
+
 
-        yield from chain(declaration, methods)
+def format_field(field: Field) -> str:
+    return " = ".join((f"{field[0]}: {field[1]}", *field[2:]))
+
+
+@cache
+def generate_concrete_node(
+    class_name: str,
+    base_class: str,
+    kind: int,
+    attrs: FieldList,
+    type_var: str,
+    indent: int = INDENT,
+) -> str:
+    indent_str = " " * indent
+    return CONCRETE_NODE_TEMPLATE.format(
+        indent=indent_str,
+        class_name=class_name,
+        base_class=base_class,
+        kind=kind,
+        attrs="".join(f"{indent_str}{format_field(field)}\n" for field in attrs),
+        type_var=type_var,
+        return_type=get_return_type(base_class, type_var),
+        method_name=get_visitor_method_name(class_name, base_class),
+    )
 
 
-def format_file(text: str) -> str:
-    if (ruff_path := which("ruff")) is None:
-        print("'ruff' is not installed. Code will not be formatted.", file=sys.stderr)
-        return text
+def format_file(path: Path) -> None:
+    if ruff_api is not None:
+        format_in_process(path)
+    else:
+        format_in_subprocess(path)
 
-    process = subprocess.run(
-        [ruff_path, "format", "-"],
-        input=text,
-        capture_output=True,
-        text=True,
-    )
+
+def format_in_process(path: Path) -> None:
+    options = ruff_api.FormatOptions(target_version=TARGET_VERSION, line_width=LINE_LENGTH)
+    try:
+        text = ruff_api.format_string(path.name, path.read_text(), options)
+    except ruff_api.RuffError as e:
+        print(e, file=sys.stderr)
+        return
+
+    path.write_text(text)
+
+
+def format_in_subprocess(path: Path) -> None:
+    if RUFF_PATH is None:
+        print("'ruff' is not installed. Code will not be formatted.", file=sys.stderr)
+        return
+
+    formatted_path = path.with_suffix(".fmt")
+    with path.open() as source, formatted_path.open("w") as destination:
+        process = subprocess.run(
+            [RUFF_PATH, "format", "-"],
+            stdin=source,
+            stdout=destination,
+            stderr=subprocess.PIPE,
+            text=True,
+        )
 
     if process.returncode != 0:
         print(process.stderr.removesuffix("\n"), file=sys.stderr)
-        return text
+        formatted_path.unlink()
+        return
 
-    return process.stdout
+    formatted_path.replace(path)
 
 
 def generate_all_nodes(
-    package_name: str, type_var: str, node_defs: NodeDefinitions
-) -> Iterator[str]:
-    imports = (
+    package_name: str, type_var: str, node_specs: tuple[NodeSpec, ...]
+) -> list[str]:
+    lines = [
         "from __future__ import annotations",
+        "",
         "from abc import ABC",
         "from abc import abstractmethod",
+        "from collections.abc import Callable",
         "from dataclasses import dataclass",
+        "from typing import Any",
+        "from typing import ClassVar",
+        "",
         f"from {package_name}.token import LiteralValue",
         f"from {package_name}.token import Token",
-    )
-    visitor = VisitorGenerator(type_var).generate_class(node_defs)
-    base_nodes = chain.from_iterable(
-        BaseNodeGenerator(base_class, type_var).generate_class() for base_class in node_defs
-    )
-    concrete_nodes = chain.from_iterable(
-        ConcreteNodeGenerator(class_name, base_class, attrs, type_var).generate_class()
-        for base_class, subclass_defs in node_defs.items()
-        for class_name, attrs in subclass_defs.items()
-    )
-
-    yield from chain(imports, visitor, base_nodes, concrete_nodes)
+        f"from {package_name}.token import TokenType",
+        *CLASS_SEPARATOR,
+    ]
+    lines.append(generate_visitor(type_var, node_specs))
+    for base_class in dict.fromkeys(base_class for base_class, _, _ in node_specs):
+        lines.extend(CLASS_SEPARATOR)
+        lines.append(generate_base_node(base_class, type_var))
+    kinds: dict[str, int] = {}
+    for base_class, class_name, attrs in node_specs:
+        kind = kinds[base_class] = kinds.get(base_class, -1) + 1
+        lines.extend(CLASS_SEPARATOR)
+        lines.append(generate_concrete_node(class_name, base_class, kind, attrs, type_var))
+
+    return lines
+
+
+def get_generation_hash(chunks: list[str]) -> str:
+    digest = hashlib.blake2b(digest_size=16)
+    for chunk in chunks:
+        digest.update(chunk.encode())
+        digest.update(b"\n")
+    return digest.hexdigest()
+
+
+def read_generation_hash(filename: Path) -> str | None:
+    try:
+        with filename.open() as file:
+            header = file.readline()
+    except FileNotFoundError:
+        return None
+
+    if not header.startswith(HASH_HEADER):
+        return None
+    return header.removeprefix(HASH_HEADER).strip()
+
+
+def generate_nodes_file(
+    package_name: str,
+    type_var: str,
+    node_specs: tuple[NodeSpec, ...],
+    run_formatter: bool = False,
+    force: bool = False,
+) -> None:
+    filename = ROOT_DIR / "src" / package_name / "nodes.py"
+    chunks = generate_all_nodes(package_name, type_var, node_specs)
+    generation_hash = get_generation_hash(chunks)
+    if not force and read_generation_hash(filename) == generation_hash:
+        print(f"File {filename} is up to date")
+        return
+
+    temp_filename = filename.with_suffix(".tmp")
+    with temp_filename.open("w") as file:
+        file.write(f"{HASH_HEADER}{generation_hash}\n")
+        for chunk in chunks:
+            file.write(chunk)
+            file.write("\n")
+
+    if run_formatter:
+        format_file(temp_filename)
+
+    temp_filename.replace(filename)
+    print(f"File saved to {filename}")
 
 
-def generate_nodes_file(package_name: str, type_var: str, node_defs: NodeDefinitions) -> None:
-    lines = generate_all_nodes(package_name, type_var, node_defs)
-    text = format_file("\n".join(lines))
-    root = Path(__file__).parent.parent.resolve()
-    filename = root / "src" / package_name / "nodes.py"
-    filename.write_text(text)
-    print(f"File saved to {filename}")
+def get_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(description="Generate the AST nodes module.")
+    parser.add_argument(
+        "--format",
+        action="store_true",
+        help="Run 'ruff format' on the generated code before saving it.",
+    )
+    parser.add_argument(
+        "--force",
+        action="store_true",
+        help="Regenerate the file even if its generation hash is up to date.",
+    )
+    return parser
 
 
 if __name__ == "__main__":
-    generate_nodes_file(PACKAGE_NAME, TYPE_VAR, NODE_DEFS)
+    args = get_parser().parse_args()
+    generate_nodes_file(PACKAGE_NAME, TYPE_VAR, NODE_SPECS, args.format, args.force)
@@ -9,6 +9,8 @@ from loxygen import nodes
 from loxygen.parser import Parser
 from loxygen.scanner import Scanner
 
+EXPECT_PATTERN = re.compile(r"// expect: (.*)")
+
 
 class ASTPrinter:
     def visit_binary_expr(self, expression: nodes.Binary) -> str:
@@ -26,11 +28,9 @@ class ASTPrinter:
         return self.parenthesize(expression.operator.lexeme, expression.right)
 
     def parenthesize(self, name: str, *exprs: nodes.Expr) -> str:
-        output = f"({name}"
-        for expression in exprs:
-            output += f" {expression.accept(cast(nodes.Visitor[str], self))}"
-        output += ")"
-        return output
+        parts = [name]
+        parts.extend(expression.accept(cast(nodes.Visitor[str], self)) for expression in exprs)
+        return f"({' '.join(parts)})"
 
     def print(self, expression: nodes.Expr) -> str:
         return expression.accept(cast(nodes.Visitor[str], self))
@@ -52,11 +52,17 @@ def test(argv: list[str]) -> None:
     if not full_path.exists():
         raise FileNotFoundError(f"The provided path does not contain {test_path}.")
 
-    text = full_path.read_text()
-    assert (match := re.search(r"// expect: (.*)", text)) is not None
-    code = match.group(1)
-    assert (match := re.search(r"^(?!//).*", text, re.MULTILINE)) is not None
-    expected = match.group(0)
+    code: str | None = None
+    expected: str | None = None
+    for line in full_path.read_text().splitlines():
+        if code is None and (match := EXPECT_PATTERN.search(line)) is not None:
+            code = match.group(1)
+        if expected is None and not line.startswith("//"):
+            expected = line
+        if code is not None and expected is not None:
+            break
+    assert code is not None
+    assert expected is not None
 
     actual = generate_ast_string(code)
 
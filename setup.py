@@ -0,0 +1,14 @@
+from __future__ import annotations
+
+import os
+
+from setuptools import Extension
+from setuptools import setup
+
+ext_modules: list[Extension] = []
+if os.environ.get("LOXYGEN_MYPYC") == "1":
+    from mypyc.build import mypycify
+
+    ext_modules = mypycify(["src/loxygen/resolver.py"])
+
+setup(ext_modules=ext_modules)
@@ -1,5 +1,6 @@
 from __future__ import annotations
 
+import os
 import re
 import shlex
 import subprocess
@@ -9,7 +10,9 @@ from collections.abc import Generator
 from collections.abc import Iterator
 from dataclasses import dataclass
 from dataclasses import field
+from functools import cached_property
 from pathlib import Path
+from shutil import which
 from typing import Literal
 from typing import Self
 from typing import cast
@@ -24,6 +27,12 @@ from contract import LoxStatus
 DEFAULT_INTERPRETER = ["loxygen"]
 DEFAULT_SKIP_DIRS = ["benchmark", "scanning", "limit", "expressions"]
 
+EXPECT_PATTERN = re.compile(
+    rf"// expect: (?P<{LoxStatus.OK.name.lower()}>.*)|"
+    rf"// (?P<{LoxStatus.STATIC_ERROR.name.lower()}>\[line \d+] Error.*)|"
+    rf"// expect runtime error: (?P<{LoxStatus.RUNTIME_ERROR.name.lower()}>(.*))",
+)
+
 type PytestIniType = Literal["string", "paths", "pathlist", "args", "linelist", "bool"]
 
 
@@ -148,7 +157,8 @@ class TestItem(pytest.Item):
         return super().repr_failure(excinfo, style)
 
     def add_result(self) -> list[str]:
-        text = self.path.read_text().splitlines()
+        assert isinstance(self.parent, LoxFile)
+        text = self.parent.source_lines.copy()
 
         for result, output in zip(self.expected, self.output):
             text[result.lineno] = text[result.lineno] + f" // output: {output.text}"
@@ -171,17 +181,19 @@ class TestItem(pytest.Item):
 
 
 class LoxFile(pytest.File):
-    def parse_test(self) -> list[ExpectedLoxEvent]:
-        pattern = re.compile(
-            rf"// expect: (?P<{LoxStatus.OK.name.lower()}>.*)|"
-            rf"// (?P<{LoxStatus.STATIC_ERROR.name.lower()}>\[line \d+] Error.*)|"
-            rf"// expect runtime error: (?P<{LoxStatus.RUNTIME_ERROR.name.lower()}>(.*))",
-        )
+    @cached_property
+    def source(self) -> str:
+        return self.path.read_text()
 
+    @cached_property
+    def source_lines(self) -> list[str]:
+        return self.source.splitlines()
+
+    def parse_test(self) -> list[ExpectedLoxEvent]:
         return [
-            ExpectedLoxEvent.from_match(result, lineno)
-            for lineno, line in enumerate(self.path.read_text().splitlines())
-            if (result := re.search(pattern, line)) is not None
+            ExpectedLoxEvent.from_match(match, lineno)
+            for lineno, line in enumerate(self.source_lines)
+            if (match := EXPECT_PATTERN.search(line)) is not None
         ]
 
     def collect(self) -> Iterator[TestItem]:
@@ -206,11 +218,21 @@ def get_value[T](config: pytest.Config, option: Option[T]) -> T:
     return cast(T, value)
 
 
+def resolve_executable(cmd: list[str]) -> list[str]:
+    if cmd and (executable := which(cmd[0])) is not None:
+        return [executable, *cmd[1:]]
+
+    return cmd
+
+
 def pytest_configure(config: pytest.Config) -> None:
     for option in OPTIONS.values():
         value = get_value(config, option)
         config.stash[option.stash_key] = value
 
+    interpreter_key = OPTIONS["interpreter-cmd"].stash_key
+    config.stash[interpreter_key] = resolve_executable(config.stash[interpreter_key])
+
 
 def pytest_collect_file(parent: pytest.Dir, file_path: Path) -> pytest.Collector | None:
     if file_path.suffix == ".lox":
@@ -243,6 +265,11 @@ def pytest_collection_modifyitems(
         mark_items_as_skipped(items)
 
 
+@pytest.hookimpl(optionalhook=True)
+def pytest_xdist_auto_num_workers(config: pytest.Config) -> int:
+    return os.cpu_count() or 1
+
+
 def pytest_runtest_makereport(item: TestItem, call: pytest.CallInfo[None]) -> pytest.TestReport:
     report = pytest.TestReport.from_item_and_call(item, call)
     if call.when == "call" and call.excinfo:
@@ -7,44 +7,48 @@ from loxygen.token import Token
 
 
 class Environment[T]:
+    __slots__ = ("values", "enclosing", "scopes")
+
     def __init__(self, enclosing: Self | None = None):
-        self.values: dict[str, T] = {}
+        self.values: list[T] = []
         self.enclosing = enclosing
+        self.scopes: tuple[list[T], ...] = (
+            (self.values,) if enclosing is None else enclosing.scopes + (self.values,)
+        )
 
-    def define(self, name: str, value: T) -> None:
-        self.values[name] = value
+    def define(self, value: T) -> None:
+        self.values.append(value)
+
+    def define_all(self, values: list[T]) -> None:
+        self.values.extend(values)
+
+    def get_at(self, distance: int, slot: int) -> T:
+        return self.scopes[-1 - distance][slot]
+
+    def assign_at(self, distance: int, slot: int, value: T) -> None:
+        self.scopes[-1 - distance][slot] = value
 
-    def ancestor(self, distance: int) -> Self:
-        environment = self
-        for _ in range(distance):
-            assert environment.enclosing is not None
-            environment = environment.enclosing
-        return environment
 
-    def get_at(self, distance: int, name: str) -> T:
-        return self.ancestor(distance).values[name]
+class GlobalEnvironment[T]:
+    __slots__ = ("values",)
 
-    def assign_at(self, distance: int, name: Token, value: T) -> None:
-        self.ancestor(distance).values[name.lexeme] = value
+    def __init__(self) -> None:
+        self.values: dict[str, T] = {}
+
+    def define(self, name: str, value: T) -> None:
+        self.values[name] = value
 
-    def get(self, name: Token) -> T:
+    def get(self, name: str, token: Token) -> T:
         try:
-            return self.values[name.lexeme]
+            return self.values[name]
         except KeyError:
             pass
 
-        if self.enclosing is not None:
-            return self.enclosing.get(name)
-
-        raise LoxRunTimeError(name, f"Undefined variable '{name.lexeme}'.")
-
-    def assign(self, name: Token, value: T) -> None:
-        if name.lexeme in self.values:
-            self.values[name.lexeme] = value
-            return
+        raise LoxRunTimeError(token, f"Undefined variable '{name}'.")
 
-        if self.enclosing is not None:
-            self.enclosing.assign(name, value)
+    def assign(self, name: str, token: Token, value: T) -> None:
+        if name in self.values:
+            self.values[name] = value
             return
 
-        raise LoxRunTimeError(name, f"Undefined variable '{name.lexeme}'.")
+        raise LoxRunTimeError(token, f"Undefined variable '{name}'.")
@@ -2,36 +2,63 @@ from __future__ import annotations
 
 from loxygen import nodes
 from loxygen.environment import Environment
+from loxygen.environment import GlobalEnvironment
 from loxygen.exceptions import LoxRunTimeError
+from loxygen.operations import NUMERIC_OPERATIONS
 from loxygen.runtime import Clock
 from loxygen.runtime import LoxCallable
 from loxygen.runtime import LoxClass
 from loxygen.runtime import LoxFunction
 from loxygen.runtime import LoxInstance
 from loxygen.runtime import LoxObject
-from loxygen.runtime import Return
 from loxygen.token import Token
 from loxygen.token import TokenType
 
+type ResolvableExpr = nodes.Assign | nodes.Super | nodes.This | nodes.Variable
+
+BANG = TokenType.BANG
+BANG_EQUAL = TokenType.BANG_EQUAL
+EQUAL_EQUAL = TokenType.EQUAL_EQUAL
+MINUS = TokenType.MINUS
+OR = TokenType.OR
+PLUS = TokenType.PLUS
+
+
+COMPARISONS = frozenset(
+    (
+        TokenType.BANG_EQUAL,
+        TokenType.EQUAL_EQUAL,
+        TokenType.GREATER,
+        TokenType.GREATER_EQUAL,
+        TokenType.LESS,
+        TokenType.LESS_EQUAL,
+    )
+)
+
 
 class Interpreter(nodes.Visitor[LoxObject]):
     def __init__(self) -> None:
-        self.globals: Environment[LoxObject] = Environment()
+        self.globals: GlobalEnvironment[LoxObject] = GlobalEnvironment()
         self.globals.define("clock", Clock())
-        self.locals: dict[nodes.Expr, int] = {}
 
-        self.env = self.globals
+        self.env: Environment[LoxObject] = Environment()
+
+        self.returning = False
+        self.return_value: LoxObject = None
+
+        self.expr_handlers = self.expr_dispatch_table()
+        self.stmt_handlers = self.stmt_dispatch_table()
 
     def visit_literal_expr(self, expr: nodes.Literal) -> LoxObject:
         return expr.value
 
     def visit_logical_expr(self, expr: nodes.Logical) -> LoxObject:
         left = self.evaluate(expr.left)
-        if expr.operator.type == TokenType.OR:
-            if self.is_truthy(left):
+        if expr.op_type == OR:
+            if left is not None and left is not False:
                 return left
         else:
-            if not self.is_truthy(left):
+            if left is None or left is False:
                 return left
 
         return self.evaluate(expr.right)
@@ -42,16 +69,14 @@ class Interpreter(nodes.Visitor[LoxObject]):
             raise LoxRunTimeError(expr.name, "Only instances have fields.")
 
         value = self.evaluate(expr.value)
-        object.set(expr.name, value)
+        object.set(expr.lexeme, value)
 
         return value
 
     def visit_super_expr(self, expr: nodes.Super) -> LoxObject:
-        distance = self.locals.get(expr)
-        assert distance is not None
-        superclass = self.env.get_at(distance, "super")
+        superclass = self.env.get_at(expr.depth, expr.slot)
         assert isinstance(superclass, LoxClass)
-        object = self.env.get_at(distance - 1, "this")
+        object = self.env.get_at(expr.depth - 1, 0)
         assert isinstance(object, LoxInstance)
         method = superclass.find_method(expr.method.lexeme)
         if method is None:
@@ -63,13 +88,14 @@ class Interpreter(nodes.Visitor[LoxObject]):
         return method.bind(object)
 
     def visit_this_expr(self, expr: nodes.This) -> LoxObject:
-        return self.look_up_variable(expr.keyword, expr)
+        return self.look_up_variable(expr.keyword.lexeme, expr.keyword, expr)
 
     def visit_unary_expr(self, expr: nodes.Unary) -> LoxObject:
         right = self.evaluate(expr.right)
-        if expr.operator.type == TokenType.BANG:
-            return not self.is_truthy(right)
-        if expr.operator.type == TokenType.MINUS:
+        op_type = expr.op_type
+        if op_type == BANG:
+            return right is None or right is False
+        if op_type == MINUS:
             if not isinstance(right, float):
                 raise LoxRunTimeError(expr.operator, "Operand must be a number.")
             return -right
@@ -77,55 +103,39 @@ class Interpreter(nodes.Visitor[LoxObject]):
         return None
 
     def visit_variable_expr(self, expr: nodes.Variable) -> LoxObject:
-        return self.look_up_variable(expr.name, expr)
+        return self.look_up_variable(expr.lexeme, expr.name, expr)
 
-    def look_up_variable(self, name: Token, expr: nodes.Expr) -> LoxObject:
-        distance = self.locals.get(expr)
-        if distance is not None:
-            return self.env.get_at(distance, name.lexeme)
-        return self.globals.get(name)
+    def look_up_variable(
+        self, name: str, token: Token, expr: nodes.This | nodes.Variable
+    ) -> LoxObject:
+        if expr.depth >= 0:
+            return self.env.get_at(expr.depth, expr.slot)
+        return self.globals.get(name, token)
 
     def visit_binary_expr(self, expr: nodes.Binary) -> LoxObject:
         left = self.evaluate(expr.left)
         right = self.evaluate(expr.right)
 
-        match expr.operator.type:
-            case TokenType.GREATER:
-                left, right = self.check_number_operands(expr.operator, left, right)
-                return left > right
-            case TokenType.GREATER_EQUAL:
-                left, right = self.check_number_operands(expr.operator, left, right)
-                return left >= right
-            case TokenType.LESS:
-                left, right = self.check_number_operands(expr.operator, left, right)
-                return left < right
-            case TokenType.LESS_EQUAL:
-                left, right = self.check_number_operands(expr.operator, left, right)
-                return left <= right
-            case TokenType.MINUS:
-                left, right = self.check_number_operands(expr.operator, left, right)
-                return left - right
-            case TokenType.PLUS:
-                if isinstance(left, float) and isinstance(right, float):
-                    return left + right
-                if isinstance(left, str) and isinstance(right, str):
-                    return left + right
-                raise LoxRunTimeError(
-                    expr.operator,
-                    "Operands must be two numbers or two strings.",
-                )
-            case TokenType.SLASH:
-                left, right = self.check_number_operands(expr.operator, left, right)
-                return left / right if right else float("nan")
-            case TokenType.STAR:
-                left, right = self.check_number_operands(expr.operator, left, right)
-                return left * right
-            case TokenType.BANG_EQUAL:
-                return not self.is_equal(left, right)
-            case TokenType.EQUAL_EQUAL:
-                return self.is_equal(left, right)
-            case _:
-                return None
+        op_type = expr.op_type
+        if (operation := NUMERIC_OPERATIONS.get(op_type)) is not None:
+            left, right = self.check_number_operands(expr.operator, left, right)
+            return operation(left, right)
+
+        if op_type == PLUS:
+            if isinstance(left, float) and isinstance(right, float):
+                return left + right
+            if isinstance(left, str) and isinstance(right, str):
+                return left + right
+            raise LoxRunTimeError(
+                expr.operator,
+                "Operands must be two numbers or two strings.",
+            )
+        if op_type == EQUAL_EQUAL:
+            return type(left) is type(right) and left == right
+        if op_type == BANG_EQUAL:
+            return type(left) is not type(right) or left != right
+
+        return None
 
     @staticmethod
     def check_number_operands(
@@ -136,7 +146,22 @@ class Interpreter(nodes.Visitor[LoxObject]):
         raise LoxRunTimeError(operator, "Operands must be numbers.")
 
     def visit_call_expr(self, expr: nodes.Call) -> LoxObject:
-        callee = self.evaluate(expr.callee)
+        callee_expr = expr.callee
+        if type(callee_expr) is nodes.Get:
+            object = self.evaluate(callee_expr.object)
+            if not isinstance(object, LoxInstance):
+                raise LoxRunTimeError(callee_expr.name, "Only instances have properties.")
+
+            lexeme = callee_expr.lexeme
+            if (method := object.find_unbound_method(lexeme)) is not None:
+                arguments = [self.evaluate(argument) for argument in expr.arguments]
+                self.check_arity(expr, method, arguments)
+                return method.call_bound(self, object, arguments)
+
+            callee = object.get(lexeme, callee_expr.name)
+        else:
+            callee = self.evaluate(callee_expr)
+
         arguments = [self.evaluate(argument) for argument in expr.arguments]
 
         if not isinstance(callee, LoxCallable):
@@ -145,49 +170,44 @@ class Interpreter(nodes.Visitor[LoxObject]):
                 "Can only call functions and classes.",
             )
 
+        self.check_arity(expr, callee, arguments)
+
+        return callee.call(self, arguments)
+
+    def check_arity(
+        self, expr: nodes.Call, callee: LoxCallable, arguments: list[LoxObject]
+    ) -> None:
         if (nb_args := len(arguments)) != (arity := callee.arity()):
             raise LoxRunTimeError(
                 expr.paren,
                 f"Expected {arity} arguments but got {nb_args}.",
             )
 
-        return callee.call(self, arguments)
-
     def visit_get_expr(self, expr: nodes.Get) -> LoxObject:
         object = self.evaluate(expr.object)
         if isinstance(object, LoxInstance):
-            return object.get(expr.name)
+            return object.get(expr.lexeme, expr.name)
 
         raise LoxRunTimeError(expr.name, "Only instances have properties.")
 
     def visit_grouping_expr(self, expr: nodes.Grouping) -> LoxObject:
         return self.evaluate(expr.expr)
 
-    @staticmethod
-    def is_truthy(obj: LoxObject) -> bool:
-        if obj is None:
-            return False
-        if isinstance(obj, bool):
-            return obj
-        return True
-
-    @staticmethod
-    def is_equal(obj1: LoxObject, obj2: LoxObject) -> bool:
-        if isinstance(obj1, float) and isinstance(obj2, bool):
-            return False
-        if isinstance(obj1, bool) and isinstance(obj2, float):
-            return False
-
-        return obj1 == obj2
-
     def evaluate(self, expr: nodes.Expr) -> LoxObject:
-        return expr.accept(self)
+        return self.expr_handlers[expr.kind](expr)
 
     def execute(self, stmt: nodes.Stmt) -> None:
-        stmt.accept(self)
+        self.stmt_handlers[stmt.kind](stmt)
+
+    def resolve(self, expr: ResolvableExpr, depth: int, slot: int) -> None:
+        expr.depth = depth
+        expr.slot = slot
 
-    def resolve(self, expr: nodes.Expr, depth: int) -> None:
-        self.locals[expr] = depth
+    def define(self, name: Token, value: LoxObject) -> None:
+        if self.env.enclosing is None:
+            self.globals.define(name.lexeme, value)
+        else:
+            self.env.define(value)
 
     def execute_block(self, stmts: list[nodes.Stmt], environment: Environment[LoxObject]) -> None:
         enclosing = self.env
@@ -195,9 +215,22 @@ class Interpreter(nodes.Visitor[LoxObject]):
             self.env = environment
             for stmt in stmts:
                 self.execute(stmt)
+                if self.returning:
+                    return
         finally:
             self.env = enclosing
 
+    def execute_function(
+        self, stmts: list[nodes.Stmt], environment: Environment[LoxObject]
+    ) -> LoxObject:
+        self.execute_block(stmts, environment)
+        if not self.returning:
+            return None
+
+        self.returning = False
+        value, self.return_value = self.return_value, None
+        return value
+
     def visit_block_stmt(self, stmt: nodes.Block) -> None:
         self.execute_block(stmt.statements, Environment(self.env))
 
@@ -212,10 +245,9 @@ class Interpreter(nodes.Visitor[LoxObject]):
                     "Superclass must be a class.",
                 )
 
-        self.env.define(stmt.name.lexeme, None)
         if stmt.superclass is not None:
             self.env = Environment(self.env)
-            self.env.define("super", superclass)
+            self.env.define(superclass)
 
         methods: dict[str, LoxFunction] = {}
         for method in stmt.methods:
@@ -228,17 +260,17 @@ class Interpreter(nodes.Visitor[LoxObject]):
             assert self.env.enclosing is not None
             self.env = self.env.enclosing
 
-        self.env.assign(stmt.name, cls)
+        self.define(stmt.name, cls)
 
     def visit_expression_stmt(self, stmt: nodes.Expression) -> None:
         self.evaluate(stmt.expr)
 
     def visit_function_stmt(self, stmt: nodes.Function) -> None:
         function = LoxFunction(stmt, self.env, False)
-        self.env.define(stmt.name.lexeme, function)
+        self.define(stmt.name, function)
 
     def visit_if_stmt(self, stmt: nodes.If) -> None:
-        if self.is_truthy(self.evaluate(stmt.condition)):
+        if (condition := self.evaluate(stmt.condition)) is not None and condition is not False:
             self.execute(stmt.then_branch)
         elif stmt.else_branch is not None:
             self.execute(stmt.else_branch)
@@ -248,29 +280,54 @@ class Interpreter(nodes.Visitor[LoxObject]):
         print(self.stringify(value))
 
     def visit_return_stmt(self, stmt: nodes.Return) -> None:
-        value = None
         if stmt.value is not None:
-            value = self.evaluate(stmt.value)
-
-        raise Return(value)
+            self.return_value = self.evaluate(stmt.value)
+        self.returning = True
 
     def visit_var_stmt(self, stmt: nodes.Var) -> None:
         value = None
         if stmt.initializer is not None:
             value = self.evaluate(stmt.initializer)
-        self.env.define(stmt.name.lexeme, value)
+        self.define(stmt.name, value)
 
     def visit_while_stmt(self, stmt: nodes.While) -> None:
-        while self.is_truthy(self.evaluate(stmt.condition)):
-            self.execute(stmt.body)
+        self.run_loop(stmt.condition, stmt.body, None)
+
+    def visit_for_stmt(self, stmt: nodes.For) -> None:
+        enclosing = self.env
+        try:
+            self.env = Environment(enclosing)
+            if stmt.initializer is not None:
+                self.execute(stmt.initializer)
+            self.run_loop(stmt.condition, stmt.body, stmt.increment)
+        finally:
+            self.env = enclosing
+
+    def run_loop(
+        self, condition: nodes.Expr, body: nodes.Stmt, increment: nodes.Expr | None
+    ) -> None:
+        if isinstance(condition, nodes.Binary) and condition.op_type in COMPARISONS:
+            while self.evaluate(condition):
+                self.execute(body)
+                if self.returning:
+                    return
+                if increment is not None:
+                    self.evaluate(increment)
+            return
+
+        while (value := self.evaluate(condition)) is not None and value is not False:
+            self.execute(body)
+            if self.returning:
+                return
+            if increment is not None:
+                self.evaluate(increment)
 
     def visit_assign_expr(self, expr: nodes.Assign) -> LoxObject:
         value = self.evaluate(expr.value)
-        distance = self.locals.get(expr)
-        if distance is not None:
-            self.env.assign_at(distance, expr.name, value)
+        if expr.depth >= 0:
+            self.env.assign_at(expr.depth, expr.slot, value)
         else:
-            self.globals.assign(expr.name, value)
+            self.globals.assign(expr.lexeme, expr.name, value)
 
         return value
 
@@ -279,11 +336,16 @@ class Interpreter(nodes.Visitor[LoxObject]):
             self.execute(stmt)
 
     def stringify(self, obj: LoxObject) -> str:
+        if type(obj) is str:
+            return obj
         if obj is None:
             return "nil"
-        if isinstance(obj, bool):
-            return str(obj).lower()
-        if isinstance(obj, float) and (repr := str(obj)).endswith(".0"):
-            return repr[:-2]
+        if obj is True:
+            return "true"
+        if obj is False:
+            return "false"
+        if type(obj) is float:
+            text = repr(obj)
+            return text[:-2] if text.endswith(".0") else text
 
         return str(obj)
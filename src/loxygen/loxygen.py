@@ -47,7 +47,7 @@ class Lox:
     def run(self, source: str) -> LoxStatus:
         scanner = Scanner(source)
         scanner.scan_tokens()
-        parser = Parser(scanner.tokens)
+        parser = Parser(scanner.tokens, fold_constants=True)
         stmts = parser.parse()
 
         errors = (error for producer in (scanner, parser) for error in producer.errors)
@@ -55,7 +55,7 @@ class Lox:
             return LoxStatus.STATIC_ERROR
 
         resolver = Resolver(self.interpreter)
-        resolver.resolve(*stmts)
+        resolver.resolve(stmts)
 
         if self.check_error(resolver.errors):
             return LoxStatus.STATIC_ERROR
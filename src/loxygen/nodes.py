@@ -1,11 +1,16 @@
+# gen-hash: 9d8df33195fb65d2f729b36bbcda785a
 from __future__ import annotations
 
 from abc import ABC
 from abc import abstractmethod
+from collections.abc import Callable
 from dataclasses import dataclass
+from typing import Any
+from typing import ClassVar
 
 from loxygen.token import LiteralValue
 from loxygen.token import Token
+from loxygen.token import TokenType
 
 
 class Visitor[T](ABC):
@@ -65,6 +70,10 @@ class Visitor[T](ABC):
     def visit_expression_stmt(self, stmt: Expression) -> None:
         pass
 
+    @abstractmethod
+    def visit_for_stmt(self, stmt: For) -> None:
+        pass
+
     @abstractmethod
     def visit_function_stmt(self, stmt: Function) -> None:
         pass
@@ -93,42 +102,86 @@ class Visitor[T](ABC):
     def visit_while_stmt(self, stmt: While) -> None:
         pass
 
-
-@dataclass(frozen=True, slots=True)
+    def expr_dispatch_table(self) -> tuple[Callable[[Any], T], ...]:
+        return (
+            self.visit_assign_expr,
+            self.visit_binary_expr,
+            self.visit_call_expr,
+            self.visit_get_expr,
+            self.visit_grouping_expr,
+            self.visit_literal_expr,
+            self.visit_logical_expr,
+            self.visit_set_expr,
+            self.visit_super_expr,
+            self.visit_this_expr,
+            self.visit_unary_expr,
+            self.visit_variable_expr,
+        )
+
+    def stmt_dispatch_table(self) -> tuple[Callable[[Any], None], ...]:
+        return (
+            self.visit_block_stmt,
+            self.visit_expression_stmt,
+            self.visit_for_stmt,
+            self.visit_function_stmt,
+            self.visit_class_stmt,
+            self.visit_if_stmt,
+            self.visit_print_stmt,
+            self.visit_return_stmt,
+            self.visit_var_stmt,
+            self.visit_while_stmt,
+        )
+
+
+@dataclass(eq=False, slots=True)
 class Expr(ABC):
+    kind: ClassVar[int]
+
     @abstractmethod
     def accept[T](self, visitor: Visitor[T]) -> T:
         pass
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Stmt(ABC):
+    kind: ClassVar[int]
+
     @abstractmethod
     def accept[T](self, visitor: Visitor[T]) -> None:
         pass
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Assign(Expr):
+    kind = 0
+
     name: Token
+    lexeme: str
     value: Expr
+    depth: int = -1
+    slot: int = -1
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_assign_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Binary(Expr):
+    kind = 1
+
     left: Expr
     operator: Token
+    op_type: TokenType
     right: Expr
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_binary_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Call(Expr):
+    kind = 2
+
     callee: Expr
     paren: Token
     arguments: list[Expr]
@@ -137,103 +190,151 @@ class Call(Expr):
         return visitor.visit_call_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Get(Expr):
+    kind = 3
+
     object: Expr
     name: Token
+    lexeme: str
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_get_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Grouping(Expr):
+    kind = 4
+
     expr: Expr
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_grouping_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Literal(Expr):
+    kind = 5
+
     value: LiteralValue
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_literal_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Logical(Expr):
+    kind = 6
+
     left: Expr
     operator: Token
+    op_type: TokenType
     right: Expr
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_logical_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Set(Expr):
+    kind = 7
+
     object: Expr
     name: Token
+    lexeme: str
     value: Expr
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_set_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Super(Expr):
+    kind = 8
+
     keyword: Token
     method: Token
+    depth: int = -1
+    slot: int = -1
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_super_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class This(Expr):
+    kind = 9
+
     keyword: Token
+    depth: int = -1
+    slot: int = -1
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_this_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Unary(Expr):
+    kind = 10
+
     operator: Token
+    op_type: TokenType
     right: Expr
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_unary_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Variable(Expr):
+    kind = 11
+
     name: Token
+    lexeme: str
+    depth: int = -1
+    slot: int = -1
 
     def accept[T](self, visitor: Visitor[T]) -> T:
         return visitor.visit_variable_expr(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Block(Stmt):
+    kind = 0
+
     statements: list[Stmt]
 
     def accept[T](self, visitor: Visitor[T]) -> None:
         return visitor.visit_block_stmt(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Expression(Stmt):
+    kind = 1
+
     expr: Expr
 
     def accept[T](self, visitor: Visitor[T]) -> None:
         return visitor.visit_expression_stmt(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
+class For(Stmt):
+    kind = 2
+
+    initializer: Stmt | None
+    condition: Expr
+    increment: Expr | None
+    body: Stmt
+
+    def accept[T](self, visitor: Visitor[T]) -> None:
+        return visitor.visit_for_stmt(self)
+
+
+@dataclass(eq=False, slots=True)
 class Function(Stmt):
+    kind = 3
+
     name: Token
     params: list[Token]
     body: list[Stmt]
@@ -242,8 +343,10 @@ class Function(Stmt):
         return visitor.visit_function_stmt(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Class(Stmt):
+    kind = 4
+
     name: Token
     superclass: Variable | None
     methods: list[Function]
@@ -252,8 +355,10 @@ class Class(Stmt):
         return visitor.visit_class_stmt(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class If(Stmt):
+    kind = 5
+
     condition: Expr
     then_branch: Stmt
     else_branch: Stmt | None
@@ -262,16 +367,20 @@ class If(Stmt):
         return visitor.visit_if_stmt(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Print(Stmt):
+    kind = 6
+
     expr: Expr
 
     def accept[T](self, visitor: Visitor[T]) -> None:
         return visitor.visit_print_stmt(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Return(Stmt):
+    kind = 7
+
     keyword: Token
     value: Expr | None
 
@@ -279,8 +388,10 @@ class Return(Stmt):
         return visitor.visit_return_stmt(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class Var(Stmt):
+    kind = 8
+
     name: Token
     initializer: Expr | None
 
@@ -288,8 +399,10 @@ class Var(Stmt):
         return visitor.visit_var_stmt(self)
 
 
-@dataclass(frozen=True, slots=True)
+@dataclass(eq=False, slots=True)
 class While(Stmt):
+    kind = 9
+
     condition: Expr
     body: Stmt
 
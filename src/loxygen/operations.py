@@ -0,0 +1,21 @@
+from __future__ import annotations
+
+import operator
+from collections.abc import Callable
+
+from loxygen.token import TokenType
+
+
+def divide(left: float, right: float) -> float:
+    return left / right if right else float("nan")
+
+
+NUMERIC_OPERATIONS: dict[TokenType, Callable[[float, float], bool | float]] = {
+    TokenType.GREATER: operator.gt,
+    TokenType.GREATER_EQUAL: operator.ge,
+    TokenType.LESS: operator.lt,
+    TokenType.LESS_EQUAL: operator.le,
+    TokenType.MINUS: operator.sub,
+    TokenType.SLASH: divide,
+    TokenType.STAR: operator.mul,
+}
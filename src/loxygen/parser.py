@@ -2,15 +2,75 @@ from __future__ import annotations
 
 from loxygen import nodes
 from loxygen.exceptions import LoxParseError
+from loxygen.operations import NUMERIC_OPERATIONS
+from loxygen.token import LiteralValue
 from loxygen.token import Token
 from loxygen.token import TokenType
 
 MAXIMUM_ARGS_NUMBER = 255
 
+EOF = TokenType.EOF
+
+EQUALITY_OPERATORS = frozenset((TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL))
+COMPARISON_OPERATORS = frozenset(
+    (TokenType.GREATER, TokenType.GREATER_EQUAL, TokenType.LESS, TokenType.LESS_EQUAL)
+)
+TERM_OPERATORS = frozenset((TokenType.MINUS, TokenType.PLUS))
+FACTOR_OPERATORS = frozenset((TokenType.SLASH, TokenType.STAR))
+OR_OPERATORS = frozenset((TokenType.OR,))
+AND_OPERATORS = frozenset((TokenType.AND,))
+UNARY_OPERATORS = frozenset((TokenType.BANG, TokenType.MINUS))
+LITERAL_TOKENS = frozenset((TokenType.NUMBER, TokenType.STRING))
+STATEMENT_KEYWORDS = frozenset(
+    (
+        TokenType.CLASS,
+        TokenType.FUN,
+        TokenType.VAR,
+        TokenType.FOR,
+        TokenType.IF,
+        TokenType.WHILE,
+        TokenType.PRINT,
+        TokenType.RETURN,
+    )
+)
+
+TRUE_LITERAL = nodes.Literal(True)
+FALSE_LITERAL = nodes.Literal(False)
+NIL_LITERAL = nodes.Literal(None)
+
+
+def fold_binary(
+    operator_type: TokenType, left: LiteralValue, right: LiteralValue
+) -> bool | float | str | None:
+    if type(left) is float and type(right) is float:
+        if (operation := NUMERIC_OPERATIONS.get(operator_type)) is not None:
+            return operation(left, right)
+        if operator_type == TokenType.PLUS:
+            return left + right
+    elif type(left) is str and type(right) is str and operator_type == TokenType.PLUS:
+        return left + right
+
+    if operator_type == TokenType.EQUAL_EQUAL:
+        return type(left) is type(right) and left == right
+    if operator_type == TokenType.BANG_EQUAL:
+        return type(left) is not type(right) or left != right
+
+    return None
+
+
+def fold_unary(operator_type: TokenType, right: LiteralValue) -> bool | float | None:
+    if operator_type == TokenType.BANG:
+        return right is None or right is False
+    if operator_type == TokenType.MINUS and type(right) is float:
+        return -right
+
+    return None
+
 
 class Parser:
-    def __init__(self, tokens: list[Token]) -> None:
+    def __init__(self, tokens: list[Token], fold_constants: bool = False) -> None:
         self.tokens = tokens
+        self.fold_constants = fold_constants
         self.current = 0
         self.errors: list[tuple[Token, str]] = []
 
@@ -42,8 +102,8 @@ class Parser:
 
         superclass = None
         if self.match(TokenType.LESS):
-            self.consume(TokenType.IDENTIFIER, "Expect superclass name.")
-            superclass = nodes.Variable(self.previous())
+            superclass_name = self.consume(TokenType.IDENTIFIER, "Expect superclass name.")
+            superclass = nodes.Variable(superclass_name, superclass_name.lexeme)
 
         self.consume(TokenType.LEFT_BRACE, "Expect '{' before class body.")
 
@@ -71,7 +131,7 @@ class Parser:
 
         return self.expression_statement()
 
-    def for_statement(self) -> nodes.Stmt:
+    def for_statement(self) -> nodes.For:
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after if.")
 
         initializer: nodes.Stmt | None
@@ -90,17 +150,10 @@ class Parser:
 
         body = self.statement()
 
-        if increment is not None:
-            body = nodes.Block([body, nodes.Expression(increment)])
-
         if condition is None:
-            condition = nodes.Literal(True)
-        body = nodes.While(condition, body)
-
-        if initializer is not None:
-            body = nodes.Block([initializer, body])
+            condition = TRUE_LITERAL
 
-        return body
+        return nodes.For(initializer, condition, increment, body)
 
     def if_statement(self) -> nodes.If:
         self.consume(TokenType.LEFT_PAREN, "Expect '(' after if.")
@@ -151,8 +204,8 @@ class Parser:
         return nodes.Expression(expr)
 
     def function(self, kind: str) -> nodes.Function:
-        name = self.consume(TokenType.IDENTIFIER, f"Expect {kind} name.")
-        self.consume(TokenType.LEFT_PAREN, f"Expect '(' after {kind} name.")
+        name = self.consume(TokenType.IDENTIFIER, "Expect {} name.", kind)
+        self.consume(TokenType.LEFT_PAREN, "Expect '(' after {} name.", kind)
         parameters: list[Token] = []
         if not self.check(TokenType.RIGHT_PAREN):
             while True:
@@ -169,7 +222,7 @@ class Parser:
                     break
 
         self.consume(TokenType.RIGHT_PAREN, "Expect ')' after parameters.")
-        self.consume(TokenType.LEFT_BRACE, f"Expect '{{' before {kind} body.")
+        self.consume(TokenType.LEFT_BRACE, "Expect '{{' before {} body.", kind)
         body = self.block()
 
         return nodes.Function(name, parameters, body)
@@ -186,82 +239,115 @@ class Parser:
 
     def assignment(self) -> nodes.Expr:
         expr = self.logical_or()
-        if self.match(TokenType.EQUAL):
-            equals = self.previous()
-            value = self.assignment()
-            if isinstance(expr, nodes.Variable):
-                return nodes.Assign(expr.name, value)
-            elif isinstance(expr, nodes.Get):
-                return nodes.Set(expr.object, expr.name, value)
-            self.error(equals, "Invalid assignment target.")
+        if not self.match(TokenType.EQUAL):
+            return expr
+
+        targets = [(expr, self.previous())]
+        expr = self.logical_or()
+        while self.match(TokenType.EQUAL):
+            targets.append((expr, self.previous()))
+            expr = self.logical_or()
+
+        for target, equals in reversed(targets):
+            if isinstance(target, nodes.Variable):
+                expr = nodes.Assign(target.name, target.lexeme, expr)
+            elif isinstance(target, nodes.Get):
+                expr = nodes.Set(target.object, target.name, target.lexeme, expr)
+            else:
+                self.error(equals, "Invalid assignment target.")
+                expr = target
         return expr
 
     def logical_or(self) -> nodes.Expr:
         expr = self.logical_and()
-        while self.match(TokenType.OR):
-            operator = self.previous()
+        while (operator := self.match_token(OR_OPERATORS)) is not None:
             right = self.logical_and()
-            expr = nodes.Logical(expr, operator, right)
+            expr = self.logical(expr, operator, right)
 
         return expr
 
     def logical_and(self) -> nodes.Expr:
         expr = self.equality()
-        while self.match(TokenType.AND):
-            operator = self.previous()
+        while (operator := self.match_token(AND_OPERATORS)) is not None:
             right = self.equality()
-            expr = nodes.Logical(expr, operator, right)
+            expr = self.logical(expr, operator, right)
 
         return expr
 
+    def logical(self, left: nodes.Expr, operator: Token, right: nodes.Expr) -> nodes.Expr:
+        if self.fold_constants and isinstance(left, nodes.Literal):
+            truthy = left.value is not None and left.value is not False
+            short_circuits = truthy if operator.type == TokenType.OR else not truthy
+            if not short_circuits:
+                if not isinstance(right, (nodes.Variable, nodes.Get)):
+                    return right
+            elif isinstance(right, nodes.Literal):
+                return left
+
+        return nodes.Logical(left, operator, operator.type, right)
+
+    def binary(self, left: nodes.Expr, operator: Token, right: nodes.Expr) -> nodes.Expr:
+        if (
+            self.fold_constants
+            and isinstance(left, nodes.Literal)
+            and isinstance(right, nodes.Literal)
+            and (value := fold_binary(operator.type, left.value, right.value)) is not None
+        ):
+            return nodes.Literal(value)
+
+        return nodes.Binary(left, operator, operator.type, right)
+
     def equality(self) -> nodes.Expr:
         expr = self.comparison()
-        while self.match(TokenType.BANG_EQUAL, TokenType.EQUAL_EQUAL):
-            operator = self.previous()
+        while (operator := self.match_token(EQUALITY_OPERATORS)) is not None:
             right = self.comparison()
-            expr = nodes.Binary(expr, operator, right)
+            expr = self.binary(expr, operator, right)
 
         return expr
 
     def comparison(self) -> nodes.Expr:
         expr = self.term()
-        while self.match(
-            TokenType.GREATER,
-            TokenType.GREATER_EQUAL,
-            TokenType.LESS,
-            TokenType.LESS_EQUAL,
-        ):
-            operator = self.previous()
+        while (operator := self.match_token(COMPARISON_OPERATORS)) is not None:
             right = self.term()
-            expr = nodes.Binary(expr, operator, right)
+            expr = self.binary(expr, operator, right)
 
         return expr
 
     def term(self) -> nodes.Expr:
         expr = self.factor()
-        while self.match(TokenType.MINUS, TokenType.PLUS):
-            operator = self.previous()
+        while (operator := self.match_token(TERM_OPERATORS)) is not None:
             right = self.factor()
-            expr = nodes.Binary(expr, operator, right)
+            expr = self.binary(expr, operator, right)
 
         return expr
 
     def factor(self) -> nodes.Expr:
         expr = self.unary()
-        while self.match(TokenType.SLASH, TokenType.STAR):
-            operator = self.previous()
+        while (operator := self.match_token(FACTOR_OPERATORS)) is not None:
             right = self.unary()
-            expr = nodes.Binary(expr, operator, right)
+            expr = self.binary(expr, operator, right)
 
         return expr
 
     def unary(self) -> nodes.Expr:
-        if self.match(TokenType.BANG, TokenType.MINUS):
-            operator = self.previous()
-            right = self.unary()
-            return nodes.Unary(operator, right)
-
-        return self.call()
+        if (operator := self.match_token(UNARY_OPERATORS)) is None:
+            return self.call()
+
+        operators = [operator]
+        while (operator := self.match_token(UNARY_OPERATORS)) is not None:
+            operators.append(operator)
+
+        expr = self.call()
+        for operator in reversed(operators):
+            if (
+                self.fold_constants
+                and isinstance(expr, nodes.Literal)
+                and (value := fold_unary(operator.type, expr.value)) is not None
+            ):
+                expr = nodes.Literal(value)
+            else:
+                expr = nodes.Unary(operator, operator.type, expr)
+        return expr
 
     def finish_call(self, callee: nodes.Expr) -> nodes.Call:
         arguments: list[nodes.Expr] = []
@@ -290,7 +376,7 @@ class Parser:
                     TokenType.IDENTIFIER,
                     "Expect property name after '.'.",
                 )
-                expr = nodes.Get(expr, name)
+                expr = nodes.Get(expr, name, name.lexeme)
             else:
                 break
 
@@ -298,17 +384,18 @@ class Parser:
 
     def primary(self) -> nodes.Expr:
         if self.match(TokenType.TRUE):
-            return nodes.Literal(True)
+            return TRUE_LITERAL
         if self.match(TokenType.FALSE):
-            return nodes.Literal(False)
+            return FALSE_LITERAL
         if self.match(TokenType.NIL):
-            return nodes.Literal(None)
-        if self.match(TokenType.NUMBER, TokenType.STRING):
+            return NIL_LITERAL
+        if self.match_any(LITERAL_TOKENS):
             return nodes.Literal(self.previous().literal)
         if self.match(TokenType.THIS):
             return nodes.This(self.previous())
         if self.match(TokenType.IDENTIFIER):
-            return nodes.Variable(self.previous())
+            name = self.previous()
+            return nodes.Variable(name, name.lexeme)
         if self.match(TokenType.SUPER):
             keyword = self.previous()
             self.consume(TokenType.DOT, "Expect '.' after 'super'.")
@@ -317,6 +404,8 @@ class Parser:
         if self.match(TokenType.LEFT_PAREN):
             expr = self.expression()
             self.consume(TokenType.RIGHT_PAREN, "Expect ')' after expression.")
+            if self.fold_constants and isinstance(expr, nodes.Literal):
+                return expr
             return nodes.Grouping(expr)
 
         raise self.error(self.peek(), "Expect expression.")
@@ -326,23 +415,41 @@ class Parser:
             self.advance()
         return check
 
-    def consume(self, token_type: TokenType, message: str) -> Token:
-        if self.check(token_type):
-            return self.advance()
-        raise self.error(self.peek(), message)
+    def match_any(self, types: frozenset[TokenType]) -> bool:
+        if self.tokens[self.current].type in types:
+            self.current += 1
+            return True
+        return False
+
+    def match_token(self, types: frozenset[TokenType]) -> Token | None:
+        token = self.tokens[self.current]
+        if token.type in types:
+            self.current += 1
+            return token
+        return None
+
+    def consume(self, token_type: TokenType, message: str, *args: str) -> Token:
+        token = self.tokens[self.current]
+        if token.type is token_type:
+            self.current += 1
+            return token
+        raise self.error(token, message.format(*args) if args else message)
+
+    def check_any(self, types: frozenset[TokenType]) -> bool:
+        return self.tokens[self.current].type in types
 
     def check(self, *types: TokenType) -> bool:
-        if self.is_at_end():
-            return False
-        return self.peek().type in types
+        token_type = self.tokens[self.current].type
+        return token_type is not EOF and token_type in types
 
     def advance(self) -> Token:
-        if not self.is_at_end():
+        tokens = self.tokens
+        if tokens[self.current].type is not EOF:
             self.current += 1
-        return self.previous()
+        return tokens[self.current - 1]
 
     def is_at_end(self) -> bool:
-        return self.peek().type == TokenType.EOF
+        return self.tokens[self.current].type is EOF
 
     def peek(self) -> Token:
         return self.tokens[self.current]
@@ -357,16 +464,6 @@ class Parser:
     def synchronize(self) -> None:
         self.advance()
         while not self.is_at_end():
-            anchors = (
-                TokenType.CLASS,
-                TokenType.FUN,
-                TokenType.VAR,
-                TokenType.FOR,
-                TokenType.IF,
-                TokenType.WHILE,
-                TokenType.PRINT,
-                TokenType.RETURN,
-            )
-            if self.previous().type == TokenType.SEMICOLON or self.check(*anchors):
+            if self.previous().type == TokenType.SEMICOLON or self.check_any(STATEMENT_KEYWORDS):
                 return
             self.advance()
@@ -1,104 +1,137 @@
 from __future__ import annotations
 
-from collections.abc import Iterator
-from contextlib import contextmanager
-from enum import Enum
+from dataclasses import dataclass
+from enum import IntEnum
 from enum import auto
 
 from loxygen import nodes
 from loxygen.interpreter import Interpreter
+from loxygen.interpreter import ResolvableExpr
 from loxygen.runtime import LoxObject
 from loxygen.token import Token
 
 
-class FunctionType(Enum):
+class FunctionType(IntEnum):
     NONE = auto()
     FUNCTION = auto()
     INITIALIZER = auto()
     METHOD = auto()
 
 
-class ClassType(Enum):
+class ClassType(IntEnum):
     NONE = auto()
     CLASS = auto()
     SUBCLASS = auto()
 
 
+@dataclass(slots=True)
+class Local:
+    depth: int
+    slot: int
+    defined: bool = False
+
+
 class Resolver(nodes.Visitor[LoxObject]):
     def __init__(self, interpreter: Interpreter):
         self.interpreter = interpreter
-        self.scopes: list[dict[str, bool]] = []
+        self.bindings: dict[str, list[Local]] = {}
+        self.scopes: list[list[str]] = []
         self.current_function = FunctionType.NONE
         self.current_class = ClassType.NONE
         self.errors: list[tuple[Token, str]] = []
 
-    @property
-    def current_scope(self) -> dict[str, bool]:
-        return self.scopes[-1]
+        self.expr_handlers = self.expr_dispatch_table()
+        self.stmt_handlers = self.stmt_dispatch_table()
 
-    def resolve(self, *statements: nodes.Expr | nodes.Stmt) -> None:
+    def resolve(self, statements: list[nodes.Stmt]) -> None:
+        stmt_handlers = self.stmt_handlers
         for statement in statements:
-            statement.accept(self)
+            stmt_handlers[statement.kind](statement)
+
+    def resolve_stmt(self, stmt: nodes.Stmt) -> None:
+        self.stmt_handlers[stmt.kind](stmt)
+
+    def resolve_expr(self, expr: nodes.Expr) -> None:
+        self.expr_handlers[expr.kind](expr)
+
+    def begin_scope(self) -> None:
+        self.scopes.append([])
+
+    def end_scope(self) -> None:
+        for lexeme in self.scopes.pop():
+            if len(shadowed := self.bindings[lexeme]) > 1:
+                shadowed.pop()
+            else:
+                del self.bindings[lexeme]
+
+    def bind(self, lexeme: str, defined: bool = False) -> None:
+        names = self.scopes[-1]
+        local = Local(len(self.scopes) - 1, len(names), defined)
+        if (shadowed := self.bindings.get(lexeme)) is None:
+            self.bindings[lexeme] = [local]
+        elif shadowed[-1].depth != local.depth:
+            shadowed.append(local)
+        else:
+            shadowed[-1] = local
+            return
+        names.append(lexeme)
 
-    @contextmanager
-    def scope(self) -> Iterator[None]:
-        try:
-            self.scopes.append({})
-            yield
-        finally:
-            self.scopes.pop()
+    def innermost(self, lexeme: str) -> Local | None:
+        if (shadowed := self.bindings.get(lexeme)) is not None:
+            return shadowed[-1]
+        return None
 
-    def declare(self, name: Token) -> None:
+    def declare(self, name: Token, defined: bool = False) -> None:
         if self.scopes:
-            if name.lexeme in self.current_scope:
+            local = self.innermost(name.lexeme)
+            if local is not None and local.depth == len(self.scopes) - 1:
                 self.errors.append(
                     (
                         name,
                         "Already a variable with this name in this scope.",
                     ),
                 )
-            self.current_scope[name.lexeme] = False
+            self.bind(name.lexeme, defined)
 
     def define(self, name: Token) -> None:
         if self.scopes:
-            self.current_scope[name.lexeme] = True
+            self.bindings[name.lexeme][-1].defined = True
 
-    def resolve_local(self, expr: nodes.Expr, name: Token) -> None:
-        for idx, scope in enumerate(reversed(self.scopes)):
-            if name.lexeme in scope:
-                self.interpreter.resolve(expr, idx)
-                break
+    def resolve_local(self, expr: ResolvableExpr, name: Token) -> None:
+        if (local := self.innermost(name.lexeme)) is not None:
+            self.interpreter.resolve(expr, len(self.scopes) - 1 - local.depth, local.slot)
 
     def resolve_function(self, function: nodes.Function, function_type: FunctionType) -> None:
         enclosing_function = self.current_function
         self.current_function = function_type
-        with self.scope():
-            for param in function.params:
-                self.declare(param)
-                self.define(param)
-            self.resolve(*function.body)
+        self.begin_scope()
+        for param in function.params:
+            self.declare(param, defined=True)
+        self.resolve(function.body)
+        self.end_scope()
 
         self.current_function = enclosing_function
 
     def resolve_class_body(self, stmt: nodes.Class) -> None:
-        with self.scope():
-            self.current_scope["this"] = True
-            for method in stmt.methods:
-                declaration = FunctionType.METHOD
-                if method.name.lexeme == "init":
-                    declaration = FunctionType.INITIALIZER
-                self.resolve_function(method, declaration)
+        self.begin_scope()
+        self.bind("this", defined=True)
+        for method in stmt.methods:
+            declaration = FunctionType.METHOD
+            if method.name.lexeme == "init":
+                declaration = FunctionType.INITIALIZER
+            self.resolve_function(method, declaration)
+        self.end_scope()
 
     def visit_block_stmt(self, stmt: nodes.Block) -> None:
-        with self.scope():
-            self.resolve(*stmt.statements)
+        self.begin_scope()
+        self.resolve(stmt.statements)
+        self.end_scope()
 
     def visit_class_stmt(self, stmt: nodes.Class) -> None:
         enclosing_class = self.current_class
         self.current_class = ClassType.CLASS
 
-        self.declare(stmt.name)
-        self.define(stmt.name)
+        self.declare(stmt.name, defined=True)
 
         if stmt.superclass is not None:
             if stmt.name.lexeme == stmt.superclass.name.lexeme:
@@ -110,10 +143,11 @@ class Resolver(nodes.Visitor[LoxObject]):
                 )
 
             self.current_class = ClassType.SUBCLASS
-            self.resolve(stmt.superclass)
-            with self.scope():
-                self.current_scope["super"] = True
-                self.resolve_class_body(stmt)
+            self.resolve_expr(stmt.superclass)
+            self.begin_scope()
+            self.bind("super", defined=True)
+            self.resolve_class_body(stmt)
+            self.end_scope()
 
         else:
             self.resolve_class_body(stmt)
@@ -121,22 +155,31 @@ class Resolver(nodes.Visitor[LoxObject]):
         self.current_class = enclosing_class
 
     def visit_expression_stmt(self, stmt: nodes.Expression) -> None:
-        self.resolve(stmt.expr)
+        self.resolve_expr(stmt.expr)
 
     def visit_function_stmt(self, stmt: nodes.Function) -> None:
-        self.declare(stmt.name)
-        self.define(stmt.name)
+        self.declare(stmt.name, defined=True)
 
         self.resolve_function(stmt, FunctionType.FUNCTION)
 
+    def visit_for_stmt(self, stmt: nodes.For) -> None:
+        self.begin_scope()
+        if stmt.initializer is not None:
+            self.resolve_stmt(stmt.initializer)
+        self.resolve_expr(stmt.condition)
+        self.resolve_stmt(stmt.body)
+        if stmt.increment is not None:
+            self.resolve_expr(stmt.increment)
+        self.end_scope()
+
     def visit_if_stmt(self, stmt: nodes.If) -> None:
-        self.resolve(stmt.condition)
-        self.resolve(stmt.then_branch)
+        self.resolve_expr(stmt.condition)
+        self.resolve_stmt(stmt.then_branch)
         if stmt.else_branch:
-            self.resolve(stmt.else_branch)
+            self.resolve_stmt(stmt.else_branch)
 
     def visit_print_stmt(self, stmt: nodes.Print) -> None:
-        self.resolve(stmt.expr)
+        self.resolve_expr(stmt.expr)
 
     def visit_return_stmt(self, stmt: nodes.Return) -> None:
         if self.current_function == FunctionType.NONE:
@@ -154,47 +197,47 @@ class Resolver(nodes.Visitor[LoxObject]):
                         "Can't return a value from an initializer.",
                     ),
                 )
-            self.resolve(stmt.value)
+            self.resolve_expr(stmt.value)
 
     def visit_var_stmt(self, stmt: nodes.Var) -> None:
         self.declare(stmt.name)
         if stmt.initializer is not None:
-            self.resolve(stmt.initializer)
+            self.resolve_expr(stmt.initializer)
         self.define(stmt.name)
 
     def visit_while_stmt(self, stmt: nodes.While) -> None:
-        self.resolve(stmt.condition)
-        self.resolve(stmt.body)
+        self.resolve_expr(stmt.condition)
+        self.resolve_stmt(stmt.body)
 
     def visit_assign_expr(self, expr: nodes.Assign) -> None:
-        self.resolve(expr.value)
+        self.resolve_expr(expr.value)
         self.resolve_local(expr, expr.name)
 
     def visit_binary_expr(self, expr: nodes.Binary) -> None:
-        self.resolve(expr.left)
-        self.resolve(expr.right)
+        self.resolve_expr(expr.left)
+        self.resolve_expr(expr.right)
 
     def visit_call_expr(self, expr: nodes.Call) -> None:
-        self.resolve(expr.callee)
+        self.resolve_expr(expr.callee)
         for argument in expr.arguments:
-            self.resolve(argument)
+            self.resolve_expr(argument)
 
     def visit_get_expr(self, expr: nodes.Get) -> None:
-        self.resolve(expr.object)
+        self.resolve_expr(expr.object)
 
     def visit_grouping_expr(self, expr: nodes.Grouping) -> None:
-        self.resolve(expr.expr)
+        self.resolve_expr(expr.expr)
 
     def visit_literal_expr(self, expr: nodes.Literal) -> None:
         pass
 
     def visit_logical_expr(self, expr: nodes.Logical) -> None:
-        self.resolve(expr.left)
-        self.resolve(expr.right)
+        self.resolve_expr(expr.left)
+        self.resolve_expr(expr.right)
 
     def visit_set_expr(self, expr: nodes.Set) -> None:
-        self.resolve(expr.value)
-        self.resolve(expr.object)
+        self.resolve_expr(expr.value)
+        self.resolve_expr(expr.object)
 
     def visit_super_expr(self, expr: nodes.Super) -> None:
         if self.current_class == ClassType.NONE:
@@ -225,10 +268,10 @@ class Resolver(nodes.Visitor[LoxObject]):
         self.resolve_local(expr, expr.keyword)
 
     def visit_unary_expr(self, expr: nodes.Unary) -> None:
-        self.resolve(expr.right)
+        self.resolve_expr(expr.right)
 
     def visit_variable_expr(self, expr: nodes.Variable) -> None:
-        if self.scopes and self.current_scope.get(expr.name.lexeme) is False:
+        if (local := self.innermost(expr.lexeme)) is not None and not local.defined:
             self.errors.append(
                 (
                     expr.name,
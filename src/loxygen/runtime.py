@@ -14,16 +14,10 @@ from loxygen.token import Token
 type LoxObject = LiteralValue | LoxCallable | LoxInstance
 
 
-class Return(RuntimeError):
-    def __init__(self, value: LoxObject):
-        super().__init__()
-        self.value = value
-
-
 class Executor(Protocol):
-    def execute_block(
+    def execute_function(
         self, stmts: list[nodes.Stmt], environment: Environment[LoxObject]
-    ) -> None: ...
+    ) -> LoxObject: ...
 
 
 class LoxCallable(ABC):
@@ -49,25 +43,34 @@ class LoxFunction(LoxCallable):
 
     def bind(self, instance: LoxInstance) -> LoxFunction:
         env = Environment(self.closure)
-        env.define("this", instance)
+        env.define(instance)
 
         return LoxFunction(self.declaration, env, self.is_initializer)
 
     def call(self, interpreter: Executor, arguments: list[LoxObject]) -> LoxObject:
-        env = Environment(self.closure)
-        for param, arg in zip(self.declaration.params, arguments, strict=False):
-            env.define(param.lexeme, arg)
-        try:
-            interpreter.execute_block(self.declaration.body, env)
-        except Return as e:
-            if self.is_initializer:
-                return self.closure.get_at(0, "this")
-            return e.value
+        return self.invoke(interpreter, self.closure, arguments)
+
+    def call_bound(
+        self, interpreter: Executor, instance: LoxInstance, arguments: list[LoxObject]
+    ) -> LoxObject:
+        closure = Environment(self.closure)
+        closure.define(instance)
+
+        return self.invoke(interpreter, closure, arguments)
 
+    def invoke(
+        self,
+        interpreter: Executor,
+        closure: Environment[LoxObject],
+        arguments: list[LoxObject],
+    ) -> LoxObject:
+        env = Environment(closure)
+        env.define_all(arguments)
+        value = interpreter.execute_function(self.declaration.body, env)
         if self.is_initializer:
-            return self.closure.get_at(0, "this")
+            return closure.get_at(0, 0)
 
-        return None
+        return value
 
     def arity(self) -> int:
         return len(self.declaration.params)
@@ -80,28 +83,24 @@ class LoxClass(LoxCallable):
     def __init__(self, name: str, superclass: LoxClass | None, methods: dict[str, LoxFunction]):
         self.name = name
         self.superclass = superclass
-        self.methods = methods
+        self.methods: dict[str, LoxFunction] = (
+            methods if superclass is None else superclass.methods | methods
+        )
+        self.initializer = self.find_method("init")
 
     def find_method(self, name: str) -> LoxFunction | None:
-        if name in self.methods:
-            return self.methods[name]
-
-        if self.superclass is not None:
-            return self.superclass.find_method(name)
-
-        return None
+        return self.methods.get(name)
 
     def call(self, interpreter: Executor, arguments: list[LoxObject]) -> LoxInstance:
         instance = LoxInstance(self)
-        if (initializer := self.find_method("init")) is not None:
-            initializer.bind(instance).call(interpreter, arguments)
+        if (initializer := self.initializer) is not None:
+            initializer.call_bound(interpreter, instance, arguments)
         return instance
 
     def arity(self) -> int:
-        initializer = self.find_method("init")
-        if initializer is None:
+        if self.initializer is None:
             return 0
-        return initializer.arity()
+        return self.initializer.arity()
 
     def __repr__(self) -> str:
         return self.name
@@ -112,18 +111,22 @@ class LoxInstance:
         self.cls = cls
         self.fields: dict[str, LoxObject] = {}
 
-    def get(self, name: Token) -> LoxObject:
-        if (field := self.fields.get(name.lexeme)) is not None:
-            return field
+    def find_unbound_method(self, name: str) -> LoxFunction | None:
+        if name in self.fields:
+            return None
+        return self.cls.find_method(name)
+
+    def get(self, name: str, token: Token) -> LoxObject:
+        if name in self.fields:
+            return self.fields[name]
 
-        method = self.cls.find_method(name.lexeme)
-        if method is not None:
+        if (method := self.find_unbound_method(name)) is not None:
             return method.bind(self)
 
-        raise LoxRunTimeError(name, f"Undefined property '{name.lexeme}'.")
+        raise LoxRunTimeError(token, f"Undefined property '{name}'.")
 
-    def set(self, name: Token, value: LoxObject) -> None:
-        self.fields[name.lexeme] = value
+    def set(self, name: str, value: LoxObject) -> None:
+        self.fields[name] = value
 
     def __repr__(self) -> str:
         return f"{self.cls.name} instance"
@@ -1,5 +1,7 @@
 from __future__ import annotations
 
+import sys
+
 from loxygen.token import LiteralValue
 from loxygen.token import Token
 from loxygen.token import TokenType
@@ -110,11 +112,11 @@ class Scanner:
     def identifier(self) -> None:
         while self.is_alphanumeric(self.peek()):
             self.advance()
-        text = self.source[self.start : self.current]
+        text = sys.intern(self.source[self.start : self.current])
         token_type = self.keywords.get(text)
         if token_type is None:
             token_type = TokenType.IDENTIFIER
-        self.add_token(token_type)
+        self.tokens.append(Token(token_type, text, None, self.line))
 
     def number(self) -> None:
         while self.is_digit(self.peek()):
@@ -1,12 +1,13 @@
 from __future__ import annotations
 
 from enum import Enum
+from enum import IntEnum
 from enum import auto
 
 type LiteralValue = bool | float | str | None
 
 
-class TokenType(Enum):
+class TokenType(IntEnum):
     # Single-character tokens.
     LEFT_PAREN = auto()
     RIGHT_PAREN = auto()
@@ -55,6 +56,8 @@ class TokenType(Enum):
 
     EOF = auto()
 
+    __str__ = Enum.__str__
+
 
 class Token:
     def __init__(self, type: TokenType, lexeme: str, literal: LiteralValue, line: int):
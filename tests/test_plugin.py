@@ -0,0 +1,20 @@
+from __future__ import annotations
+
+from pathlib import Path
+
+import pytest
+
+from loxtest.plugin import LoxFile
+
+
+def test_expectation_lines_match_source_lines(
+    request: pytest.FixtureRequest, tmp_path: Path
+) -> None:
+    path = tmp_path / "form_feed.lox"
+    path.write_text("print 1;\x0cprint 2; // expect: 2\nprint 3; // expect: 3\n")
+    lox_file = LoxFile.from_parent(request.session, path=path)
+
+    expected = lox_file.parse_test()
+
+    assert [(event.lineno, event.text) for event in expected] == [(1, "2"), (2, "3")]
+    assert lox_file.source_lines[1] == "print 2; // expect: 2"
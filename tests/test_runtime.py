@@ -0,0 +1,27 @@
+from __future__ import annotations
+
+import pytest
+
+from contract import LoxStatus
+from loxygen.loxygen import Lox
+
+METHOD_CLASS = 'class A { m() { return "method"; } }\nvar a = A();\n'
+
+
+def test_method_call(capsys: pytest.CaptureFixture[str]) -> None:
+    assert Lox().run(METHOD_CLASS + "print a.m();") == LoxStatus.OK
+    assert capsys.readouterr().out == "method\n"
+
+
+def test_function_field_shadows_method(capsys: pytest.CaptureFixture[str]) -> None:
+    source = METHOD_CLASS + 'fun f() { return "field"; }\na.m = f;\nprint a.m();\nprint a.m;'
+    assert Lox().run(source) == LoxStatus.OK
+    assert capsys.readouterr().out == "field\n<fn f>\n"
+
+
+def test_nil_field_shadows_method(capsys: pytest.CaptureFixture[str]) -> None:
+    assert Lox().run(METHOD_CLASS + "a.m = nil;\nprint a.m;") == LoxStatus.OK
+    assert capsys.readouterr().out == "nil\n"
+
+    assert Lox().run(METHOD_CLASS + "a.m = nil;\na.m();") == LoxStatus.RUNTIME_ERROR
+    assert capsys.readouterr().err == "[line 4] Can only call functions and classes.\n"